@@ -4,49 +4,149 @@ Market Data Downloader
 Downloads stock data using yfinance and saves to CSV files.
 """
 
+import functools
 import os
 import sys
 import yaml
+import requests
 import yfinance as yf
 import pandas as pd
 import logging
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import requests_cache
+except ImportError:  # requests-cache is optional; plain pooling still helps
+    requests_cache = None
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # libyaml not available; pure-Python loader
+    from yaml import SafeLoader as _YamlLoader
+
+
+@functools.lru_cache(maxsize=8)
+def _load_yaml(path, mtime):
+    """Parse a YAML file, memoized on (path, mtime)."""
+    with open(path, 'r') as file:
+        return yaml.load(file, Loader=_YamlLoader)
+
+
+# basicConfig only needs to run for the first instance in a process
+_logging_configured = False
+
+
+def _fast_to_csv(df, path):
+    """Write a DataFrame as CSV using one precomputed format string per row.
+
+    Formatting a whole row with a single %-interpolation avoids the
+    per-cell formatting overhead DataFrame.to_csv pays.
+    """
+    # pandas dtype predicates handle extension dtypes such as tz-aware
+    # datetimes or StringDtype, which numpy's checks reject
+    parts = []
+    for dtype in df.dtypes:
+        if pd.api.types.is_float_dtype(dtype):
+            parts.append('%.6f')
+        elif pd.api.types.is_integer_dtype(dtype):
+            parts.append('%d')
+        else:
+            parts.append('%s')
+    fmt = ','.join(parts) + '\n'
+
+    with open(path, 'w', encoding='utf-8') as fh:
+        fh.write(','.join(df.columns) + '\n')
+        for row in df.itertuples(index=False, name=None):
+            if any(v != v for v in row):
+                # Missing values become empty fields, like to_csv writes
+                # them; '%.6f' would render the literal token 'nan'
+                fh.write(','.join('' if v != v else p % v
+                                  for p, v in zip(parts, row)) + '\n')
+            else:
+                fh.write(fmt % row)
 
 
 class MarketDataDownloader:
-    def __init__(self, config_path="config/symbols.yaml"):
+    def __init__(self, config_path="config/symbols.yaml", use_csv=False):
         """Initialize the data downloader with configuration."""
         self.script_dir = Path(__file__).parent.parent
         self.config_path = self.script_dir / config_path
         self.config = self._load_config()
+        self.use_csv = use_csv
         self._setup_logging()
+
+        # Resolve the output directory once; save_data reuses it per symbol
+        self.data_dir = self.script_dir / self.config['paths']['data_dir']
+        self.data_dir.mkdir(exist_ok=True)
+
+        # On-disk cache so repeat runs within a day skip the network
+        self.cache_dir = self.data_dir / "cache"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # One pooled session amortizes TCP+TLS handshakes across symbols;
+        # with requests-cache installed it doubles as an HTTP-level cache
+        if requests_cache is not None:
+            self.session = requests_cache.CachedSession(
+                str(self.cache_dir / "yf_http_cache"),
+                backend='sqlite', expire_after=3600)
+        else:
+            self.session = requests.Session()
+
+    def _cache_path(self, symbol, period, interval):
+        """Cache file path keyed on symbol, window and download date."""
+        date_str = datetime.now().strftime('%Y%m%d')
+        return self.cache_dir / f"{symbol}_{period}_{interval}_{date_str}.parquet"
+
+    def _read_cache(self, cache_file):
+        """Return the cached DataFrame, or None if unreadable/missing."""
+        if not cache_file.exists():
+            return None
+        try:
+            return pd.read_parquet(cache_file, engine='pyarrow')
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable cache {cache_file}: {e}")
+            return None
+
+    def _write_cache(self, data, cache_file):
+        """Persist a downloaded DataFrame to the cache, best effort."""
+        try:
+            data.to_parquet(cache_file, engine='pyarrow', compression='snappy')
+        except Exception as e:
+            self.logger.warning(f"Could not write cache {cache_file}: {e}")
         
     def _load_config(self):
-        """Load configuration from YAML file."""
+        """Load configuration from YAML file (cached on path and mtime)."""
         try:
-            with open(self.config_path, 'r') as file:
-                return yaml.safe_load(file)
+            return _load_yaml(str(self.config_path),
+                              self.config_path.stat().st_mtime)
         except Exception as e:
             print(f"Error loading config: {e}")
             sys.exit(1)
-            
+
     def _setup_logging(self):
-        """Setup logging configuration."""
-        log_dir = self.script_dir / self.config['paths']['logs_dir']
-        log_dir.mkdir(exist_ok=True)
-        
-        log_file = log_dir / f"data_download_{datetime.now().strftime('%Y%m%d')}.log"
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
+        """Setup logging configuration (once per process)."""
+        global _logging_configured
+
+        if not _logging_configured:
+            log_dir = self.script_dir / self.config['paths']['logs_dir']
+            log_dir.mkdir(exist_ok=True)
+
+            log_file = log_dir / f"data_download_{datetime.now().strftime('%Y%m%d')}.log"
+
+            logging.basicConfig(
+                level=logging.INFO,
+                format='%(asctime)s - %(levelname)s - %(message)s',
+                handlers=[
+                    logging.FileHandler(log_file),
+                    logging.StreamHandler(sys.stdout)
+                ]
+            )
+            _logging_configured = True
+
         self.logger = logging.getLogger(__name__)
         
     def download_symbol_data(self, symbol, period=None, interval=None):
@@ -54,23 +154,31 @@ class MarketDataDownloader:
         try:
             period = period or self.config['data_settings']['period']
             interval = interval or self.config['data_settings']['interval']
-            
+
+            cache_file = self._cache_path(symbol, period, interval)
+            cached = self._read_cache(cache_file)
+            if cached is not None:
+                self.logger.info(f"Using cached data for {symbol}")
+                return cached
+
             self.logger.info(f"Downloading data for {symbol}")
-            
+
             # Download data using yfinance
-            ticker = yf.Ticker(symbol)
+            ticker = yf.Ticker(symbol, session=self.session)
             data = ticker.history(period=period, interval=interval)
-            
+
             if data.empty:
                 self.logger.warning(f"No data found for {symbol}")
                 return None
-                
+
             # Add symbol column
             data['Symbol'] = symbol
-            
+
             # Reset index to make Date a column
             data.reset_index(inplace=True)
-            
+
+            self._write_cache(data, cache_file)
+
             self.logger.info(f"Downloaded {len(data)} records for {symbol}")
             return data
             
@@ -79,19 +187,20 @@ class MarketDataDownloader:
             return None
             
     def save_data(self, data, symbol, date_str=None):
-        """Save data to CSV file."""
+        """Save data to a Parquet file (or CSV in legacy mode)."""
         if data is None or data.empty:
             return False
-            
+
         try:
-            data_dir = self.script_dir / self.config['paths']['data_dir']
-            data_dir.mkdir(exist_ok=True)
-            
             date_str = date_str or datetime.now().strftime('%Y%m%d')
-            filename = f"{symbol}_{date_str}.csv"
-            filepath = data_dir / filename
-            
-            data.to_csv(filepath, index=False)
+
+            if self.use_csv:
+                filepath = self.data_dir / f"{symbol}_{date_str}.csv"
+                _fast_to_csv(data, filepath)
+            else:
+                filepath = self.data_dir / f"{symbol}_{date_str}.parquet"
+                data.to_parquet(filepath, engine='pyarrow', compression='snappy')
+
             self.logger.info(f"Saved data to {filepath}")
             return True
             
@@ -99,22 +208,109 @@ class MarketDataDownloader:
             self.logger.error(f"Error saving data for {symbol}: {e}")
             return False
             
+    def download_batch(self, symbols, period=None, interval=None):
+        """Download a batch of symbols with a single yfinance request."""
+        period = period or self.config['data_settings']['period']
+        interval = interval or self.config['data_settings']['interval']
+
+        # Serve today's already-cached symbols locally, fetch the rest
+        results = {}
+        to_fetch = []
+        for symbol in symbols:
+            cached = self._read_cache(self._cache_path(symbol, period, interval))
+            if cached is not None:
+                self.logger.info(f"Using cached data for {symbol}")
+                results[symbol] = cached
+            else:
+                to_fetch.append(symbol)
+
+        if not to_fetch:
+            return results
+
+        self.logger.info(f"Downloading batch of {len(to_fetch)} symbols")
+
+        try:
+            batch = yf.download(to_fetch, period=period, interval=interval,
+                                group_by='ticker', threads=True, progress=False,
+                                session=self.session)
+        except Exception as e:
+            self.logger.error(f"Error downloading batch {to_fetch}: {e}")
+            return results
+
+        # yfinance returns ticker-level MultiIndex columns whenever
+        # group_by='ticker', even for a single symbol, so branch on the
+        # actual column shape rather than the request size
+        grouped_cols = isinstance(batch.columns, pd.MultiIndex)
+
+        for symbol in to_fetch:
+            try:
+                data = batch[symbol] if grouped_cols else batch
+            except KeyError:
+                self.logger.warning(f"No data found for {symbol}")
+                continue
+
+            data = data.dropna(how='all')
+            if data.empty:
+                self.logger.warning(f"No data found for {symbol}")
+                continue
+
+            data = data.copy()
+            data['Symbol'] = symbol
+            data.reset_index(inplace=True)
+
+            self._write_cache(data, self._cache_path(symbol, period, interval))
+
+            self.logger.info(f"Downloaded {len(data)} records for {symbol}")
+            results[symbol] = data
+
+        return results
+
+    def _download_and_save_batch(self, symbols, date_str=None, retries=3, backoff=1.0):
+        """Download and save a chunk of symbols, retrying stragglers."""
+        saved = []
+        remaining = list(symbols)
+
+        for attempt in range(retries):
+            results = self.download_batch(remaining)
+            for symbol, data in results.items():
+                if self.save_data(data, symbol, date_str):
+                    saved.append(symbol)
+
+            remaining = [s for s in remaining if s not in saved]
+            if not remaining:
+                break
+            if attempt < retries - 1:
+                time.sleep(backoff * (2 ** attempt))
+
+        return saved, remaining
+
+    # Yahoo's endpoint handles up to ~20 tickers per request
+    BATCH_SIZE = 20
+
     def download_all_symbols(self, symbols=None):
         """Download data for all configured symbols."""
         symbols = symbols or self.config['symbols']
-        
+
         successful_downloads = 0
         failed_downloads = []
-        
+
         self.logger.info(f"Starting download for {len(symbols)} symbols")
-        
-        for symbol in symbols:
-            data = self.download_symbol_data(symbol)
-            if self.save_data(data, symbol):
-                successful_downloads += 1
-            else:
-                failed_downloads.append(symbol)
-                
+
+        # Compute the date stamp once instead of per saved symbol
+        date_str = datetime.now().strftime('%Y%m%d')
+
+        # Batch symbols per request, and issue the batches concurrently
+        chunks = [symbols[i:i + self.BATCH_SIZE]
+                  for i in range(0, len(symbols), self.BATCH_SIZE)]
+
+        with ThreadPoolExecutor(max_workers=min(8, max(1, len(chunks)))) as executor:
+            futures = [executor.submit(self._download_and_save_batch, chunk, date_str)
+                       for chunk in chunks]
+            for future in as_completed(futures):
+                saved, failed = future.result()
+                successful_downloads += len(saved)
+                failed_downloads.extend(failed)
+
         self.logger.info(f"Download complete: {successful_downloads} successful, {len(failed_downloads)} failed")
         
         if failed_downloads:
@@ -125,7 +321,7 @@ class MarketDataDownloader:
     def get_latest_data(self, symbol, days=5):
         """Get latest data for a symbol (last N days)."""
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = yf.Ticker(symbol, session=self.session)
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days)
             
@@ -146,11 +342,12 @@ def main():
     parser.add_argument('--period', default=None, help='Data period (1d, 1mo, 1y, etc.)')
     parser.add_argument('--interval', default=None, help='Data interval (1d, 1h, etc.)')
     parser.add_argument('--config', default='config/symbols.yaml', help='Config file path')
-    
+    parser.add_argument('--csv', action='store_true', help='Save CSV instead of Parquet (legacy)')
+
     args = parser.parse_args()
-    
+
     # Initialize downloader
-    downloader = MarketDataDownloader(args.config)
+    downloader = MarketDataDownloader(args.config, use_csv=args.csv)
     
     # Download data
     if args.symbols:
@@ -13,13 +13,84 @@ from datetime import datetime
 from pathlib import Path
 import argparse
 import glob
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+try:
+    import polars as pl
+except ImportError:  # polars is optional; pandas handles CSV ingest
+    pl = None
+
+try:
+    import talib
+except ImportError:  # TA-Lib needs a compiled C library; kernels cover it
+    talib = None
+
+from indicators_numba import (_HAVE_CUDA, _compute_all, _compute_all_batch,
+                              _daily_returns, _ewm_mean, _rolling_mean,
+                              _rolling_std, _rsi, compute_all_batch_gpu,
+                              warmup)
+
+
+# Leading symbol in data filenames like AAPL_20240101.parquet
+_SYMBOL_PAT = re.compile(r'^([^_]+)_')
+
+# Input columns the pipeline actually uses, with explicit CSV dtypes so
+# the reader skips inference and parses straight into the target types
+_LOAD_COLS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+_CSV_DTYPES = {'Open': 'float32', 'High': 'float32', 'Low': 'float32',
+               'Close': 'float32', 'Volume': 'float64'}
+
+# Derived indicator columns; approximate by nature, so stored as float32
+_FLOAT32_COLS = ('SMA_20', 'SMA_50', 'EMA_20', 'RSI', 'BB_Upper', 'BB_Middle',
+                 'BB_Lower', 'MACD', 'MACD_Signal', 'MACD_Histogram',
+                 'Volatility', 'Volume_MA', 'Volume_Ratio', 'OBV',
+                 'Daily_Return', 'Price_Change', 'Price_Change_Pct',
+                 'HL_Spread', 'HL_Spread_Pct')
+
+
+def _fast_to_csv(df, path):
+    """CSV writer for the legacy path: one format string per row.
+
+    Builds the %-format once from the column dtypes so each row is
+    rendered with a single interpolation instead of per-cell calls.
+    """
+    # pandas dtype predicates: np.issubdtype chokes on extension dtypes
+    # such as tz-aware datetimes or StringDtype
+    parts = []
+    for dtype in df.dtypes:
+        if pd.api.types.is_float_dtype(dtype):
+            parts.append('%.6f')
+        elif pd.api.types.is_integer_dtype(dtype):
+            parts.append('%d')
+        else:
+            parts.append('%s')
+    fmt = ','.join(parts) + '\n'
+
+    with open(path, 'w', encoding='utf-8') as fh:
+        fh.write(','.join(df.columns) + '\n')
+        for row in df.itertuples(index=False, name=None):
+            if any(v != v for v in row):
+                # Missing values become empty fields, like to_csv writes
+                # them; '%.6f' would render the literal token 'nan'
+                fh.write(','.join('' if v != v else p % v
+                                  for p, v in zip(parts, row)) + '\n')
+            else:
+                fh.write(fmt % row)
 
 
 class MarketDataProcessor:
-    def __init__(self):
+    def __init__(self, use_csv=False):
         """Initialize the data processor."""
         self.script_dir = Path(__file__).parent.parent
+        self.use_csv = use_csv
         self._setup_logging()
+
+        # Compile (or load from numba's disk cache) the kernels up front
+        # so JIT latency never lands on the first real file
+        warmup()
         
     def _setup_logging(self):
         """Setup logging configuration."""
@@ -40,61 +111,76 @@ class MarketDataProcessor:
         
     def calculate_sma(self, data, window=20):
         """Calculate Simple Moving Average."""
-        return data['Close'].rolling(window=window).mean()
-        
+        close = data['Close'].to_numpy(dtype=np.float64)
+        if talib is not None:
+            return talib.SMA(close, timeperiod=window)
+        return _rolling_mean(close, window)
+
     def calculate_ema(self, data, window=20):
         """Calculate Exponential Moving Average."""
-        return data['Close'].ewm(span=window).mean()
-        
+        close = data['Close'].to_numpy(dtype=np.float64)
+        if talib is not None:
+            return talib.EMA(close, timeperiod=window)
+        return _ewm_mean(close, window)
+
     def calculate_rsi(self, data, window=14):
         """Calculate Relative Strength Index."""
-        delta = data['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
-        
+        close = data['Close'].to_numpy(dtype=np.float64)
+        if talib is not None:
+            return talib.RSI(close, timeperiod=window)
+        return _rsi(close, window)
+
     def calculate_bollinger_bands(self, data, window=20, num_std=2):
         """Calculate Bollinger Bands."""
-        sma = self.calculate_sma(data, window)
-        std = data['Close'].rolling(window=window).std()
-        
+        close = data['Close'].to_numpy(dtype=np.float64)
+        if talib is not None:
+            return talib.BBANDS(close, timeperiod=window,
+                                nbdevup=num_std, nbdevdn=num_std)
+
+        sma = _rolling_mean(close, window)
+        std = _rolling_std(close, window)
+
         upper_band = sma + (std * num_std)
         lower_band = sma - (std * num_std)
-        
+
         return upper_band, sma, lower_band
-        
+
     def calculate_macd(self, data, fast=12, slow=26, signal=9):
         """Calculate MACD (Moving Average Convergence Divergence)."""
-        ema_fast = self.calculate_ema(data, fast)
-        ema_slow = self.calculate_ema(data, slow)
-        
+        close = data['Close'].to_numpy(dtype=np.float64)
+        if talib is not None:
+            return talib.MACD(close, fastperiod=fast, slowperiod=slow,
+                              signalperiod=signal)
+
+        ema_fast = _ewm_mean(close, fast)
+        ema_slow = _ewm_mean(close, slow)
+
         macd_line = ema_fast - ema_slow
-        signal_line = macd_line.ewm(span=signal).mean()
+        signal_line = _ewm_mean(macd_line, signal)
         histogram = macd_line - signal_line
-        
+
         return macd_line, signal_line, histogram
-        
+
     def calculate_volatility(self, data, window=20):
         """Calculate rolling volatility (standard deviation of returns)."""
-        returns = data['Close'].pct_change()
-        return returns.rolling(window=window).std() * np.sqrt(252)  # Annualized
-        
+        returns = _daily_returns(data['Close'].to_numpy(dtype=np.float64))
+        return _rolling_std(returns, window) * np.sqrt(252)  # Annualized
+
     def calculate_volume_indicators(self, data):
         """Calculate volume-based indicators."""
+        close = data['Close'].to_numpy(dtype=np.float64)
+        volume = data['Volume'].to_numpy(dtype=np.float64)
+
         # Volume moving average
-        vol_ma = data['Volume'].rolling(window=20).mean()
-        
+        vol_ma = _rolling_mean(volume, 20)
+
         # Volume ratio (current volume / average volume)
-        vol_ratio = data['Volume'] / vol_ma
-        
-        # On-Balance Volume (OBV)
-        obv = np.where(data['Close'] > data['Close'].shift(1), 
-                       data['Volume'], 
-                       np.where(data['Close'] < data['Close'].shift(1), 
-                               -data['Volume'], 0)).cumsum()
-        
+        vol_ratio = volume / vol_ma
+
+        # On-Balance Volume (OBV): branchless sign * volume, one pass
+        delta = np.diff(close, prepend=close[0])
+        obv = (np.sign(delta) * volume).cumsum()
+
         return vol_ma, vol_ratio, obv
         
     def process_symbol_data(self, symbol, data_file):
@@ -102,54 +188,111 @@ class MarketDataProcessor:
         try:
             self.logger.info(f"Processing data for {symbol}")
             
-            # Load data
-            data = pd.read_csv(data_file)
-            data['Date'] = pd.to_datetime(data['Date'])
+            # Load only the columns the pipeline uses (Parquet is typed;
+            # CSV parses straight into declared dtypes)
+            if str(data_file).endswith('.parquet'):
+                data = pd.read_parquet(data_file, engine='pyarrow',
+                                       columns=_LOAD_COLS)
+            elif pl is not None:
+                # Polars tokenizes CSV multi-threaded and parses Date inline
+                data = pl.read_csv(data_file, columns=_LOAD_COLS,
+                                   try_parse_dates=True).to_pandas()
+                data['Date'] = pd.to_datetime(data['Date'])
+            else:
+                data = pd.read_csv(data_file, usecols=_LOAD_COLS,
+                                   dtype=_CSV_DTYPES, parse_dates=['Date'],
+                                   engine='c')
             data = data.sort_values('Date').reset_index(drop=True)
             
-            # Calculate price-based indicators
-            data['SMA_20'] = self.calculate_sma(data, 20)
-            data['SMA_50'] = self.calculate_sma(data, 50)
-            data['EMA_20'] = self.calculate_ema(data, 20)
-            data['RSI'] = self.calculate_rsi(data)
-            
-            # Bollinger Bands
-            bb_upper, bb_middle, bb_lower = self.calculate_bollinger_bands(data)
-            data['BB_Upper'] = bb_upper
-            data['BB_Middle'] = bb_middle
-            data['BB_Lower'] = bb_lower
-            
-            # MACD
-            macd, signal, histogram = self.calculate_macd(data)
-            data['MACD'] = macd
-            data['MACD_Signal'] = signal
-            data['MACD_Histogram'] = histogram
-            
-            # Volatility
-            data['Volatility'] = self.calculate_volatility(data)
-            
-            # Volume indicators
-            vol_ma, vol_ratio, obv = self.calculate_volume_indicators(data)
-            data['Volume_MA'] = vol_ma
-            data['Volume_Ratio'] = vol_ratio
-            data['OBV'] = obv
-            
-            # Price change indicators
-            data['Daily_Return'] = data['Close'].pct_change()
-            data['Price_Change'] = data['Close'] - data['Open']
-            data['Price_Change_Pct'] = (data['Close'] - data['Open']) / data['Open'] * 100
-            
-            # High-Low spread
-            data['HL_Spread'] = data['High'] - data['Low']
-            data['HL_Spread_Pct'] = (data['High'] - data['Low']) / data['Close'] * 100
-            
+            # Extract columns once as contiguous float64 arrays (SoA layout)
+            close = data['Close'].to_numpy(dtype=np.float64)
+            volume = data['Volume'].to_numpy(dtype=np.float64)
+
+            # One fused pass computes every running-state indicator
+            self._assign_indicators(data, volume, _compute_all(close, volume))
+
             self.logger.info(f"Added technical indicators for {symbol}")
             return data
-            
+
         except Exception as e:
             self.logger.error(f"Error processing {symbol}: {e}")
             return None
-            
+
+    def _assign_indicators(self, data, volume, parts):
+        """Attach the fused-kernel outputs plus derived columns in place."""
+        (sma_20, sma_50, ema_20, ema_12, ema_26, rsi, bb_std,
+         vol_ma, obv, returns, volatility) = parts
+
+        # Price-based indicators
+        data['SMA_20'] = sma_20
+        data['SMA_50'] = sma_50
+        data['EMA_20'] = ema_20
+        data['RSI'] = rsi
+
+        # Bollinger Bands
+        data['BB_Upper'] = sma_20 + (bb_std * 2)
+        data['BB_Middle'] = sma_20
+        data['BB_Lower'] = sma_20 - (bb_std * 2)
+
+        # MACD (signal/histogram derived from the fused EMAs)
+        macd = ema_12 - ema_26
+        signal = _ewm_mean(macd, 9)
+        data['MACD'] = macd
+        data['MACD_Signal'] = signal
+        data['MACD_Histogram'] = macd - signal
+
+        # Volatility
+        data['Volatility'] = volatility
+
+        # Volume indicators
+        data['Volume_MA'] = vol_ma
+        data['Volume_Ratio'] = volume / vol_ma
+        data['OBV'] = obv
+
+        # Price change indicators
+        data['Daily_Return'] = returns
+        data['Price_Change'] = data['Close'] - data['Open']
+        data['Price_Change_Pct'] = (data['Close'] - data['Open']) / data['Open'] * 100
+        
+        # High-Low spread
+        data['HL_Spread'] = data['High'] - data['Low']
+        data['HL_Spread_Pct'] = (data['High'] - data['Low']) / data['Close'] * 100
+
+        # Halve memory bandwidth and file size for the derived columns
+        for col in _FLOAT32_COLS:
+            data[col] = data[col].astype(np.float32)
+
+        return data
+
+    def process_batch(self, symbol_dfs, use_gpu=False):
+        """Compute indicators for many symbols as one (symbols, time) batch.
+
+        All DataFrames must share a common date grid (equal length, same
+        order), e.g. the per-symbol frames of one yfinance batch
+        download. Indicator columns are attached to each frame in place.
+        With use_gpu the batch runs on CUDA (one thread per symbol),
+        falling back to the CPU kernel when no device is available.
+        """
+        symbols = list(symbol_dfs)
+        close_mat = np.stack([symbol_dfs[s]['Close'].to_numpy(dtype=np.float64)
+                              for s in symbols])
+        volume_mat = np.stack([symbol_dfs[s]['Volume'].to_numpy(dtype=np.float64)
+                               for s in symbols])
+
+        if use_gpu and _HAVE_CUDA:
+            results = compute_all_batch_gpu(close_mat, volume_mat)
+        else:
+            if use_gpu:
+                self.logger.warning("CUDA not available, using CPU batch kernel")
+            results = _compute_all_batch(close_mat, volume_mat)
+
+        for idx, symbol in enumerate(symbols):
+            parts = tuple(arr[idx] for arr in results)
+            self._assign_indicators(symbol_dfs[symbol], volume_mat[idx], parts)
+            self.logger.info(f"Added technical indicators for {symbol}")
+
+        return symbol_dfs
+
     def save_processed_data(self, data, symbol):
         """Save processed data with technical indicators."""
         try:
@@ -157,10 +300,14 @@ class MarketDataProcessor:
             processed_dir.mkdir(exist_ok=True)
             
             date_str = datetime.now().strftime('%Y%m%d')
-            filename = f"{symbol}_processed_{date_str}.csv"
-            filepath = processed_dir / filename
-            
-            data.to_csv(filepath, index=False)
+
+            if self.use_csv:
+                filepath = processed_dir / f"{symbol}_processed_{date_str}.csv"
+                _fast_to_csv(data, filepath)
+            else:
+                filepath = processed_dir / f"{symbol}_processed_{date_str}.parquet"
+                data.to_parquet(filepath, engine='pyarrow', compression='snappy')
+
             self.logger.info(f"Saved processed data to {filepath}")
             return filepath
             
@@ -189,6 +336,43 @@ class MarketDataProcessor:
         
         return summary
         
+    def generate_summary_stats_batch(self, last_rows):
+        """Generate summary statistics for many symbols in one pass.
+
+        Takes a DataFrame of one latest row per symbol and computes the
+        Bollinger position and MACD signal as vectorized columns instead
+        of per-symbol Python branches.
+        """
+        last_rows = last_rows.reset_index(drop=True)
+
+        bb_width = last_rows['BB_Upper'] - last_rows['BB_Lower']
+        position = (last_rows['Close'] - last_rows['BB_Lower']) / bb_width
+        bb_position = np.select(
+            [bb_width.isna() | (bb_width == 0), position > 0.8, position < 0.2],
+            ['N/A', 'Upper', 'Lower'], default='Middle')
+
+        macd_valid = last_rows['MACD'].notna() & last_rows['MACD_Signal'].notna()
+        macd_signal = np.where(
+            last_rows['MACD'] > last_rows['MACD_Signal'], 'Bullish', 'Bearish')
+        macd_signal = np.where(macd_valid, macd_signal, 'N/A')
+
+        summary_df = pd.DataFrame({
+            'symbol': last_rows['Symbol'],
+            'date': last_rows['Date'],
+            'close_price': last_rows['Close'],
+            'daily_return': last_rows['Daily_Return'],
+            'volume': last_rows['Volume'],
+            'volume_ratio': last_rows['Volume_Ratio'],
+            'rsi': last_rows['RSI'],
+            'sma_20': last_rows['SMA_20'],
+            'sma_50': last_rows['SMA_50'],
+            'volatility': last_rows['Volatility'],
+            'bb_position': bb_position,
+            'macd_signal': macd_signal,
+        })
+
+        return summary_df.to_dict('records')
+
     def _calculate_bb_position(self, row):
         """Calculate position relative to Bollinger Bands."""
         if pd.isna(row['BB_Upper']) or pd.isna(row['BB_Lower']):
@@ -219,53 +403,91 @@ class MarketDataProcessor:
             
     def process_all_data(self, data_dir=None):
         """Process all available data files."""
-        data_dir = data_dir or (self.script_dir / "data")
-        
-        # Find all CSV files in data directory
-        pattern = str(data_dir / "*.csv")
-        data_files = glob.glob(pattern)
-        
-        if not data_files:
+        data_dir = Path(data_dir or (self.script_dir / "data"))
+
+        # One scandir pass lists data files and extracts symbols without
+        # the extra stat calls glob performs per match. Parquet wins over
+        # a CSV with the same stem so a symbol downloaded in both formats
+        # isn't processed twice.
+        unique = {}
+        if data_dir.exists():
+            with os.scandir(data_dir) as it:
+                for entry in it:
+                    if not entry.is_file():
+                        continue
+                    stem, ext = os.path.splitext(entry.name)
+                    if ext not in ('.parquet', '.csv'):
+                        continue
+                    if ext == '.csv' and stem in unique:
+                        continue
+                    match = _SYMBOL_PAT.match(entry.name)
+                    symbol = match.group(1) if match else stem
+                    unique[stem] = (entry.path, symbol)
+        tasks = list(unique.values())
+
+        if not tasks:
             self.logger.warning("No data files found to process")
             return []
-            
-        summaries = []
-        
-        for data_file in data_files:
-            # Extract symbol from filename
-            filename = Path(data_file).name
-            if '_' in filename:
-                symbol = filename.split('_')[0]
-            else:
-                symbol = filename.replace('.csv', '')
-                
-            # Process the data
-            processed_data = self.process_symbol_data(symbol, data_file)
-            
-            if processed_data is not None:
-                # Save processed data
-                self.save_processed_data(processed_data, symbol)
-                
-                # Generate summary
-                summary = self.generate_summary_stats(processed_data, symbol)
-                summaries.append(summary)
-                
-        return summaries
+
+        last_rows = []
+
+        # Each file is independent, so fan the work out across cores
+        worker = partial(_process_one, use_csv=self.use_csv)
+        # Spawned (not forked) workers: warmup() has already started
+        # numba's threading layer in this process, and forking a process
+        # with live native threads deadlocks the interpreter at shutdown
+        with ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                mp_context=multiprocessing.get_context('spawn')) as executor:
+            for last_row in executor.map(worker, tasks, chunksize=4):
+                if last_row is not None:
+                    last_rows.append(last_row)
+
+        if not last_rows:
+            return []
+
+        # Summaries for every symbol in one vectorized pass
+        return self.generate_summary_stats_batch(pd.concat(last_rows))
+
+
+# Per-worker processor instance, created lazily on first use
+_worker_processor = None
+
+
+def _process_one(task, use_csv=False):
+    """Process one (path, symbol) task end-to-end in a worker process."""
+    data_file, symbol = task
+
+    global _worker_processor
+    if _worker_processor is None or _worker_processor.use_csv != use_csv:
+        _worker_processor = MarketDataProcessor(use_csv=use_csv)
+
+    processed_data = _worker_processor.process_symbol_data(symbol, data_file)
+    if processed_data is None:
+        return None
+
+    _worker_processor.save_processed_data(processed_data, symbol)
+
+    # Only the latest row crosses the process boundary; the parent
+    # computes the summaries for all symbols in one vectorized pass
+    return processed_data.iloc[[-1]].assign(Symbol=symbol)
 
 
 def main():
     parser = argparse.ArgumentParser(description='Process market data and calculate technical indicators')
     parser.add_argument('--data-dir', help='Directory containing CSV data files')
     parser.add_argument('--symbol', help='Process specific symbol only')
-    
+    parser.add_argument('--csv', action='store_true', help='Save CSV instead of Parquet (legacy)')
+
     args = parser.parse_args()
-    
-    processor = MarketDataProcessor()
-    
+
+    processor = MarketDataProcessor(use_csv=args.csv)
+
     if args.symbol:
         # Process specific symbol
-        data_file = processor.script_dir / "data" / f"{args.symbol}*.csv"
-        files = glob.glob(str(data_file))
+        data_dir = processor.script_dir / "data"
+        files = (glob.glob(str(data_dir / f"{args.symbol}*.parquet")) or
+                 glob.glob(str(data_dir / f"{args.symbol}*.csv")))
         if files:
             processed_data = processor.process_symbol_data(args.symbol, files[0])
             if processed_data is not None:
@@ -85,7 +85,7 @@ check_data_freshness() {
     local total_files=0
     
     # Check raw data files
-    for file in "${DATA_DIR}"/*.csv; do
+    for file in "${DATA_DIR}"/*.csv "${DATA_DIR}"/*.parquet; do
         if [[ -f "$file" ]]; then
             total_files=$((total_files + 1))
             local file_time=$(stat -f %m "$file" 2>/dev/null || stat -c %Y "$file" 2>/dev/null)
@@ -115,7 +115,7 @@ check_data_quality() {
     local quality_issues=0
     
     # Check if we have data files
-    local data_file_count=$(find "${DATA_DIR}" -name "*.csv" -type f | wc -l)
+    local data_file_count=$(find "${DATA_DIR}" \( -name "*.csv" -o -name "*.parquet" \) -type f -not -path "*/cache/*" | wc -l)
     if [[ $data_file_count -eq 0 ]]; then
         send_alert "ERROR" "No data files found"
         return 1
@@ -132,15 +132,18 @@ from pathlib import Path
 data_dir = Path("${DATA_DIR}")
 quality_issues = 0
 
-# Check each CSV file
-for csv_file in data_dir.glob("*.csv"):
+# Check each data file (Parquet by default, CSV in legacy mode)
+for data_file in sorted(data_dir.glob("*.parquet")) + sorted(data_dir.glob("*.csv")):
     try:
-        df = pd.read_csv(csv_file)
-        symbol = csv_file.stem.split('_')[0]
+        if data_file.suffix == ".parquet":
+            df = pd.read_parquet(data_file)
+        else:
+            df = pd.read_csv(data_file)
+        symbol = data_file.stem.split('_')[0]
         
         # Check if file is empty
         if df.empty:
-            print(f"WARN: Empty data file: {csv_file.name}")
+            print(f"WARN: Empty data file: {data_file.name}")
             quality_issues += 1
             continue
             
@@ -148,7 +151,7 @@ for csv_file in data_dir.glob("*.csv"):
         required_cols = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
         missing_cols = [col for col in required_cols if col not in df.columns]
         if missing_cols:
-            print(f"ERROR: Missing columns in {csv_file.name}: {missing_cols}")
+            print(f"ERROR: Missing columns in {data_file.name}: {missing_cols}")
             quality_issues += 1
             continue
             
@@ -177,7 +180,7 @@ for csv_file in data_dir.glob("*.csv"):
             quality_issues += 1
             
     except Exception as e:
-        print(f"ERROR: Failed to check {csv_file.name}: {e}")
+        print(f"ERROR: Failed to check {data_file.name}: {e}")
         quality_issues += 1
 
 print(f"INFO: Data quality check completed. Issues found: {quality_issues}")
@@ -333,7 +336,7 @@ generate_monitoring_report() {
         <h3>Quick Metrics</h3>
         <div class="metric">
             <strong>Data Files</strong><br>
-            $(find "${DATA_DIR}" -name "*.csv" -type f | wc -l)
+            $(find "${DATA_DIR}" \( -name "*.csv" -o -name "*.parquet" \) -type f -not -path "*/cache/*" | wc -l)
         </div>
         <div class="metric">
             <strong>Disk Usage</strong><br>
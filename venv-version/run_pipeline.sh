@@ -217,10 +217,10 @@ cleanup_old_files() {
     log_message "INFO" "Cleaning up files older than ${days_to_keep} days..."
     
     # Clean old data files (keep processed files longer)
-    find "${SCRIPT_DIR}/data" -name "*.csv" -mtime +${days_to_keep} -not -path "*/processed/*" -delete 2>/dev/null || true
+    find "${SCRIPT_DIR}/data" \( -name "*.csv" -o -name "*.parquet" \) -mtime +${days_to_keep} -not -path "*/processed/*" -delete 2>/dev/null || true
     
     # Clean old processed files (keep longer)
-    find "${SCRIPT_DIR}/data/processed" -name "*.csv" -mtime +$((days_to_keep * 2)) -delete 2>/dev/null || true
+    find "${SCRIPT_DIR}/data/processed" \( -name "*.csv" -o -name "*.parquet" \) -mtime +$((days_to_keep * 2)) -delete 2>/dev/null || true
     
     # Clean old logs
     find "${LOG_DIR}" -name "*.log" -mtime +${days_to_keep} -delete 2>/dev/null || true
@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+"""
+Numba Indicator Kernels
+Single-pass technical indicator kernels shared by the data processor.
+"""
+
+import math
+
+import numpy as np
+
+try:
+    from numba import cuda
+    _HAVE_CUDA = cuda.is_available()
+except Exception:  # no numba, or no usable CUDA driver
+    cuda = None
+    _HAVE_CUDA = False
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; kernels fall back to plain Python
+    prange = range
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
+
+@njit(cache=True)
+def _rolling_mean(values, window):
+    """Rolling mean via a running sum (one pass, no intermediate arrays)."""
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    if n < window:
+        return out
+    total = 0.0
+    for i in range(window):
+        total += values[i]
+    out[window - 1] = total / window
+    for i in range(window, n):
+        total += values[i] - values[i - window]
+        out[i] = total / window
+    return out
+
+
+@njit(cache=True)
+def _rolling_std(values, window):
+    """Rolling sample standard deviation via sliding sum/sum-of-squares.
+
+    Adds the entering point and subtracts the leaving one, so the whole
+    series costs O(n) instead of rescanning each window (O(n*w)).
+    """
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+
+    # Skip leading NaNs (e.g. the first pct_change return) so they never
+    # poison the running sums
+    start = 0
+    while start < n and values[start] != values[start]:
+        start += 1
+    if n - start < window:
+        return out
+
+    s1 = 0.0
+    s2 = 0.0
+    for i in range(start, start + window):
+        s1 += values[i]
+        s2 += values[i] * values[i]
+    var = (s2 - s1 * s1 / window) / (window - 1)
+    out[start + window - 1] = np.sqrt(var) if var > 0.0 else 0.0
+    for i in range(start + window, n):
+        old = values[i - window]
+        s1 += values[i] - old
+        s2 += values[i] * values[i] - old * old
+        var = (s2 - s1 * s1 / window) / (window - 1)
+        out[i] = np.sqrt(var) if var > 0.0 else 0.0
+    return out
+
+
+@njit(cache=True)
+def _ewm_mean(values, span):
+    """Exponential moving average matching pandas ewm(span=...).mean()."""
+    n = values.shape[0]
+    out = np.empty(n)
+    alpha = 2.0 / (span + 1.0)
+    decay = 1.0 - alpha
+    num = 0.0
+    den = 0.0
+    for i in range(n):
+        num = num * decay + values[i]
+        den = den * decay + 1.0
+        out[i] = num / den
+    return out
+
+
+@njit(cache=True)
+def _rsi(values, window):
+    """Relative Strength Index with Wilder smoothing."""
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    if n <= window:
+        return out
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, window + 1):
+        delta = values[i] - values[i - 1]
+        if delta > 0:
+            avg_gain += delta
+        else:
+            avg_loss -= delta
+    avg_gain /= window
+    avg_loss /= window
+    if avg_loss == 0:
+        out[window] = 100.0
+    else:
+        out[window] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    for i in range(window + 1, n):
+        delta = values[i] - values[i - 1]
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        avg_gain = (avg_gain * (window - 1) + gain) / window
+        avg_loss = (avg_loss * (window - 1) + loss) / window
+        if avg_loss == 0:
+            out[i] = 100.0
+        else:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return out
+
+
+@njit(cache=True)
+def _daily_returns(values):
+    """Simple percentage change, matching pandas pct_change()."""
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    for i in range(1, n):
+        out[i] = values[i] / values[i - 1] - 1.0
+    return out
+
+
+@njit(cache=True, fastmath=True)
+def _compute_all(close, volume):
+    """Fused single-pass kernel computing every indicator in one loop.
+
+    Maintains O(1) running state (window sums, sum-of-squares, EMA and
+    Wilder accumulators) so each bar is read from memory exactly once,
+    instead of one full traversal per indicator.
+    """
+    n = close.shape[0]
+    sma20 = np.full(n, np.nan)
+    sma50 = np.full(n, np.nan)
+    ema20 = np.empty(n)
+    ema12 = np.empty(n)
+    ema26 = np.empty(n)
+    rsi = np.full(n, np.nan)
+    bb_std = np.full(n, np.nan)
+    vol_ma = np.full(n, np.nan)
+    obv = np.empty(n)
+    ret = np.full(n, np.nan)
+    volatility = np.full(n, np.nan)
+
+    a20 = 2.0 / 21.0
+    a12 = 2.0 / 13.0
+    a26 = 2.0 / 27.0
+    num20 = 0.0
+    den20 = 0.0
+    num12 = 0.0
+    den12 = 0.0
+    num26 = 0.0
+    den26 = 0.0
+    s20 = 0.0
+    ss20 = 0.0
+    s50 = 0.0
+    vs20 = 0.0
+    rsum = 0.0
+    rsumsq = 0.0
+    avg_gain = 0.0
+    avg_loss = 0.0
+    obv_acc = 0.0
+
+    for i in range(n):
+        c = close[i]
+        v = volume[i]
+
+        # EMAs (pandas adjust=True recurrence)
+        num20 = num20 * (1.0 - a20) + c
+        den20 = den20 * (1.0 - a20) + 1.0
+        ema20[i] = num20 / den20
+        num12 = num12 * (1.0 - a12) + c
+        den12 = den12 * (1.0 - a12) + 1.0
+        ema12[i] = num12 / den12
+        num26 = num26 * (1.0 - a26) + c
+        den26 = den26 * (1.0 - a26) + 1.0
+        ema26[i] = num26 / den26
+
+        # Running window sums for SMA20/SMA50, Bollinger std and volume MA
+        s20 += c
+        ss20 += c * c
+        s50 += c
+        vs20 += v
+        if i >= 20:
+            old = close[i - 20]
+            s20 -= old
+            ss20 -= old * old
+            vs20 -= volume[i - 20]
+        if i >= 50:
+            s50 -= close[i - 50]
+        if i >= 19:
+            sma20[i] = s20 / 20.0
+            var = (ss20 - s20 * s20 / 20.0) / 19.0
+            bb_std[i] = np.sqrt(var) if var > 0.0 else 0.0
+            vol_ma[i] = vs20 / 20.0
+        if i >= 49:
+            sma50[i] = s50 / 50.0
+
+        if i > 0:
+            delta = c - close[i - 1]
+            r = c / close[i - 1] - 1.0
+            ret[i] = r
+
+            # On-Balance Volume (branchless sign update)
+            obv_acc += np.sign(delta) * v
+
+            # Annualized volatility over the last 20 returns
+            rsum += r
+            rsumsq += r * r
+            if i >= 21:
+                old_r = ret[i - 20]
+                rsum -= old_r
+                rsumsq -= old_r * old_r
+            if i >= 20:
+                var = (rsumsq - rsum * rsum / 20.0) / 19.0
+                volatility[i] = np.sqrt(var * 252.0) if var > 0.0 else 0.0
+
+            # Wilder RSI (14)
+            gain = delta if delta > 0.0 else 0.0
+            loss = -delta if delta < 0.0 else 0.0
+            if i <= 14:
+                avg_gain += gain
+                avg_loss += loss
+                if i == 14:
+                    avg_gain /= 14.0
+                    avg_loss /= 14.0
+                    if avg_loss == 0.0:
+                        rsi[i] = 100.0
+                    else:
+                        rsi[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+            else:
+                avg_gain = (avg_gain * 13.0 + gain) / 14.0
+                avg_loss = (avg_loss * 13.0 + loss) / 14.0
+                if avg_loss == 0.0:
+                    rsi[i] = 100.0
+                else:
+                    rsi[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+        obv[i] = obv_acc
+
+    return sma20, sma50, ema20, ema12, ema26, rsi, bb_std, vol_ma, obv, ret, volatility
+
+
+@njit(cache=True, parallel=True)
+def _compute_all_batch(close_mat, volume_mat):
+    """Run the fused kernel over a (symbols, time) batch, one row per core.
+
+    Rows are independent, so prange distributes symbols across threads
+    while each thread keeps its running state in registers.
+    """
+    n_symbols, n = close_mat.shape
+    sma20 = np.empty((n_symbols, n))
+    sma50 = np.empty((n_symbols, n))
+    ema20 = np.empty((n_symbols, n))
+    ema12 = np.empty((n_symbols, n))
+    ema26 = np.empty((n_symbols, n))
+    rsi = np.empty((n_symbols, n))
+    bb_std = np.empty((n_symbols, n))
+    vol_ma = np.empty((n_symbols, n))
+    obv = np.empty((n_symbols, n))
+    ret = np.empty((n_symbols, n))
+    volatility = np.empty((n_symbols, n))
+
+    for s in prange(n_symbols):
+        row = _compute_all(close_mat[s], volume_mat[s])
+        sma20[s] = row[0]
+        sma50[s] = row[1]
+        ema20[s] = row[2]
+        ema12[s] = row[3]
+        ema26[s] = row[4]
+        rsi[s] = row[5]
+        bb_std[s] = row[6]
+        vol_ma[s] = row[7]
+        obv[s] = row[8]
+        ret[s] = row[9]
+        volatility[s] = row[10]
+
+    return (sma20, sma50, ema20, ema12, ema26, rsi, bb_std, vol_ma, obv,
+            ret, volatility)
+
+
+@njit(cache=True, parallel=True)
+def _summary_stats(ret30):
+    """NaN-aware mean/std over a (symbols, 30) stacked returns block.
+
+    Returns mean7, mean30, std7, std30 arrays (sample std, matching
+    pandas) computed one row per core. Rows shorter than the window are
+    expected to be left-padded with NaN.
+    """
+    n, w = ret30.shape
+    m7 = np.empty(n)
+    m30 = np.empty(n)
+    s7 = np.empty(n)
+    s30 = np.empty(n)
+
+    for i in prange(n):
+        # One sweep accumulates sum and sum of squares for both windows;
+        # the last-7 columns feed both sets of accumulators
+        c30 = 0
+        sum30 = 0.0
+        ss30 = 0.0
+        c7 = 0
+        sum7 = 0.0
+        ss7 = 0.0
+        for j in range(w):
+            v = ret30[i, j]
+            if v == v:
+                c30 += 1
+                sum30 += v
+                ss30 += v * v
+                if j >= w - 7:
+                    c7 += 1
+                    sum7 += v
+                    ss7 += v * v
+
+        m30[i] = sum30 / c30 if c30 > 0 else np.nan
+        if c30 > 1:
+            var = (ss30 - sum30 * sum30 / c30) / (c30 - 1)
+            s30[i] = math.sqrt(var) if var > 0.0 else 0.0
+        else:
+            s30[i] = np.nan
+
+        m7[i] = sum7 / c7 if c7 > 0 else np.nan
+        if c7 > 1:
+            var = (ss7 - sum7 * sum7 / c7) / (c7 - 1)
+            s7[i] = math.sqrt(var) if var > 0.0 else 0.0
+        else:
+            s7[i] = np.nan
+
+    return m7, m30, s7, s30
+
+
+if _HAVE_CUDA:
+    @cuda.jit
+    def _compute_all_gpu(close_mat, volume_mat, sma20, sma50, ema20, ema12,
+                         ema26, rsi, bb_std, vol_ma, obv, ret, volatility):
+        """Device kernel: one thread walks one symbol's time axis.
+
+        Same state machine as _compute_all, with all running state held
+        in registers and results written to (symbols, time) outputs.
+        """
+        s = cuda.grid(1)
+        if s >= close_mat.shape[0]:
+            return
+
+        n = close_mat.shape[1]
+        nan = math.nan
+
+        a20 = 2.0 / 21.0
+        a12 = 2.0 / 13.0
+        a26 = 2.0 / 27.0
+        num20 = 0.0
+        den20 = 0.0
+        num12 = 0.0
+        den12 = 0.0
+        num26 = 0.0
+        den26 = 0.0
+        s20 = 0.0
+        ss20 = 0.0
+        s50 = 0.0
+        vs20 = 0.0
+        rsum = 0.0
+        rsumsq = 0.0
+        avg_gain = 0.0
+        avg_loss = 0.0
+        obv_acc = 0.0
+
+        for i in range(n):
+            c = close_mat[s, i]
+            v = volume_mat[s, i]
+
+            sma20[s, i] = nan
+            sma50[s, i] = nan
+            rsi[s, i] = nan
+            bb_std[s, i] = nan
+            vol_ma[s, i] = nan
+            ret[s, i] = nan
+            volatility[s, i] = nan
+
+            num20 = num20 * (1.0 - a20) + c
+            den20 = den20 * (1.0 - a20) + 1.0
+            ema20[s, i] = num20 / den20
+            num12 = num12 * (1.0 - a12) + c
+            den12 = den12 * (1.0 - a12) + 1.0
+            ema12[s, i] = num12 / den12
+            num26 = num26 * (1.0 - a26) + c
+            den26 = den26 * (1.0 - a26) + 1.0
+            ema26[s, i] = num26 / den26
+
+            s20 += c
+            ss20 += c * c
+            s50 += c
+            vs20 += v
+            if i >= 20:
+                old = close_mat[s, i - 20]
+                s20 -= old
+                ss20 -= old * old
+                vs20 -= volume_mat[s, i - 20]
+            if i >= 50:
+                s50 -= close_mat[s, i - 50]
+            if i >= 19:
+                sma20[s, i] = s20 / 20.0
+                var = (ss20 - s20 * s20 / 20.0) / 19.0
+                bb_std[s, i] = math.sqrt(var) if var > 0.0 else 0.0
+                vol_ma[s, i] = vs20 / 20.0
+            if i >= 49:
+                sma50[s, i] = s50 / 50.0
+
+            if i > 0:
+                delta = c - close_mat[s, i - 1]
+                r = c / close_mat[s, i - 1] - 1.0
+                ret[s, i] = r
+
+                if delta > 0.0:
+                    obv_acc += v
+                elif delta < 0.0:
+                    obv_acc -= v
+
+                rsum += r
+                rsumsq += r * r
+                if i >= 21:
+                    old_r = ret[s, i - 20]
+                    rsum -= old_r
+                    rsumsq -= old_r * old_r
+                if i >= 20:
+                    var = (rsumsq - rsum * rsum / 20.0) / 19.0
+                    volatility[s, i] = math.sqrt(var * 252.0) if var > 0.0 else 0.0
+
+                gain = delta if delta > 0.0 else 0.0
+                loss = -delta if delta < 0.0 else 0.0
+                if i <= 14:
+                    avg_gain += gain
+                    avg_loss += loss
+                    if i == 14:
+                        avg_gain /= 14.0
+                        avg_loss /= 14.0
+                        if avg_loss == 0.0:
+                            rsi[s, i] = 100.0
+                        else:
+                            rsi[s, i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+                else:
+                    avg_gain = (avg_gain * 13.0 + gain) / 14.0
+                    avg_loss = (avg_loss * 13.0 + loss) / 14.0
+                    if avg_loss == 0.0:
+                        rsi[s, i] = 100.0
+                    else:
+                        rsi[s, i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+            obv[s, i] = obv_acc
+
+
+def compute_all_batch_gpu(close_mat, volume_mat):
+    """Run the fused indicator pass on the GPU across a (S, T) batch.
+
+    Each symbol is handled by one thread, so throughput scales with the
+    number of tickers. Raises RuntimeError when CUDA is unavailable;
+    callers should fall back to _compute_all_batch.
+    """
+    if not _HAVE_CUDA:
+        raise RuntimeError("CUDA is not available")
+
+    n_symbols = close_mat.shape[0]
+
+    d_close = cuda.to_device(np.ascontiguousarray(close_mat, dtype=np.float64))
+    d_volume = cuda.to_device(np.ascontiguousarray(volume_mat, dtype=np.float64))
+    d_outs = [cuda.device_array(close_mat.shape, dtype=np.float64)
+              for _ in range(11)]
+
+    threads = 64
+    blocks = (n_symbols + threads - 1) // threads
+    _compute_all_gpu[blocks, threads](d_close, d_volume, *d_outs)
+
+    return tuple(d.copy_to_host() for d in d_outs)
+
+
+def warmup():
+    """Run every kernel once on tiny inputs to populate numba's cache.
+
+    For short-lived CLI runs this moves JIT latency out of the first
+    real file; with cache=True later processes load the compiled code
+    from disk instead of recompiling.
+    """
+    # Non-zero values: the return kernels divide by the previous close,
+    # so an all-zero series would raise ZeroDivisionError here
+    x = np.ones(2, dtype=np.float64)
+    _rolling_mean(x, 2)
+    _rolling_std(x, 2)
+    _ewm_mean(x, 2)
+    _rsi(x, 1)
+    _daily_returns(x)
+    _compute_all(x, x)
+    _compute_all_batch(x.reshape(1, 2), x.reshape(1, 2))
+    _summary_stats(np.ones((1, 30), dtype=np.float64))